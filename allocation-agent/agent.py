@@ -1,93 +1,139 @@
 import csv
+import functools
 import json
+import statistics
 import sys
 import time
+from collections import defaultdict
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+KEYWORDS_PATH = Path(__file__).resolve().parent / "keywords.json"
+
+MISSING_VALUES = frozenset({"?", "", "N/A", "None"})
+
+NUMERIC_FIELDS = {
+    "revenue_growth": "Revenue_Growth_3Y",
+    "ebitda_margin": "EBITDA_Margin",
+    "debt_to_equity": "Debt_to_Equity",
+    "volatility": "Volatility_1Y",
+    "esg_score": "ESG_Score",
+}
+
+OPERATIONAL_RISK_CODES = {"Low": 0, "Medium": 1, "High": 2}
+UNKNOWN_RISK_CODE = 3
+# Indexed by operational risk code; the last entry scores unrecognised ratings
+OPERATIONAL_RISK_SCORES = (1.0, 0.6, 0.2, 0.5)
+
+FINANCIAL_WEIGHT = 0.30
+RISK_WEIGHT = 0.45
+NEWS_WEIGHT = 0.25
+
 
 def load_companies(filepath):
-    companies = []
+    companies = {
+        "name": [],
+        **{key: [] for key in NUMERIC_FIELDS},
+        "operational_risk": [],
+        "operational_risk_code": [],
+        "data_quality": [],
+        "data_issues": [],
+        "is_corrupted": [],
+    }
     with open(filepath, "r") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader)
+        index = {col: i for i, col in enumerate(header)}
+        numeric_columns = [
+            (companies[key], col, index[col]) for key, col in NUMERIC_FIELDS.items()
+        ]
+        name_i = index["Company"]
+        op_risk_i = index["Operational_Risk"]
+        quality_i = index["Data_Quality_Flag"]
+        
         for row in reader:
-            company = {"name": row["Company"].strip()}
-            
-            numeric_fields = {
-                "revenue_growth": "Revenue_Growth_3Y",
-                "ebitda_margin": "EBITDA_Margin",
-                "debt_to_equity": "Debt_to_Equity",
-                "volatility": "Volatility_1Y",
-                "esg_score": "ESG_Score",
-            }
+            if not row:
+                continue
+            companies["name"].append(sys.intern(row[name_i].strip()))
             
             data_issues = []
-            for key, col in numeric_fields.items():
-                raw = row[col].strip()
-                if raw in ("?", "", "N/A", "None"):
-                    company[key] = None
+            for column, col, i in numeric_columns:
+                raw = row[i].strip()
+                if raw in MISSING_VALUES:
+                    column.append(None)
                     data_issues.append(f"Missing {col}")
                 else:
                     try:
-                        company[key] = float(raw)
+                        column.append(float(raw))
                     except ValueError:
-                        company[key] = None
+                        column.append(None)
                         data_issues.append(f"Unparseable {col}: {raw}")
             
-            company["operational_risk"] = row["Operational_Risk"].strip()
-            company["data_quality"] = row["Data_Quality_Flag"].strip()
-            company["data_issues"] = data_issues
-            company["is_corrupted"] = company["data_quality"] == "CORRUPTED"
-            
-            companies.append(company)
+            op_risk = row[op_risk_i].strip()
+            data_quality = row[quality_i].strip()
+            companies["operational_risk"].append(op_risk)
+            companies["operational_risk_code"].append(
+                OPERATIONAL_RISK_CODES.get(op_risk, UNKNOWN_RISK_CODE)
+            )
+            companies["data_quality"].append(data_quality)
+            companies["data_issues"].append(data_issues)
+            companies["is_corrupted"].append(data_quality == "CORRUPTED")
     return companies
 
 
 def impute_missing(companies):
-    valid_esg = [c["esg_score"] for c in companies 
-                 if c["esg_score"] is not None and not c["is_corrupted"]]
-    sorted_esg = sorted(valid_esg)
-    n = len(sorted_esg)
-    median_esg = sorted_esg[n // 2] if n % 2 == 1 else (sorted_esg[n // 2 - 1] + sorted_esg[n // 2]) / 2
+    esg = companies["esg_score"]
+    corrupted = companies["is_corrupted"]
+    valid_esg = [e for e, bad in zip(esg, corrupted) if e is not None and not bad]
+    median_esg = statistics.median(valid_esg)
+    fill = {False: round(median_esg, 1), True: round(median_esg * 0.9, 1)}
     
-    for c in companies:
-        if c["esg_score"] is None:
-            penalty = 0.9 if c["is_corrupted"] else 1.0
-            c["esg_score"] = round(median_esg * penalty, 1)
-            c["esg_imputed"] = True
-        else:
-            c["esg_imputed"] = False
+    missing = [e is None for e in esg]
+    companies["esg_score"] = [
+        fill[bad] if is_missing else e for e, bad, is_missing in zip(esg, corrupted, missing)
+    ]
+    companies["esg_imputed"] = missing
 
 
-def extract_news_signals(filepath):
-    with open(filepath, "r") as f:
-        text = f.read()
-    
-    with open("keywords.json", "r") as f:
+@functools.lru_cache(maxsize=1)
+def _load_keywords():
+    with open(KEYWORDS_PATH, "r") as f:
         keywords = json.load(f)
+    return {cls: list(dict.fromkeys(kw.lower() for kw in words)) for cls, words in keywords.items()}
+
+
+def extract_news_signals(filepath):
+    text = Path(filepath).read_text()
+    keywords = _load_keywords()
     
-    paragraphs = [p.strip() for p in text.strip().split("\n\n") if p.strip()]
-    news_signals = {}
+    paragraphs = [p for p in (chunk.strip() for chunk in text.split("\n\n")) if p]
+    counts_by_company = defaultdict(lambda: [0, 0, 0])
     
     for para in paragraphs:
-        company_name = " ".join(para.split()[:2])
+        company_name = sys.intern(" ".join(para.split(None, 2)[:2]))
         para_lower = para.lower()
         
-        pos = sum(1 for kw in keywords["positive"] if kw in para_lower)
-        neg = sum(1 for kw in keywords["negative"] if kw in para_lower)
-        unc = sum(1 for kw in keywords["uncertainty"] if kw in para_lower)
-        
+        counts = counts_by_company[company_name]
+        counts[0] += sum(1 for kw in keywords["positive"] if kw in para_lower)
+        counts[1] += sum(1 for kw in keywords["negative"] if kw in para_lower)
+        counts[2] += sum(1 for kw in keywords["uncertainty"] if kw in para_lower)
+    
+    news_signals = {}
+    for company_name, (pos, neg, unc) in counts_by_company.items():
         raw = (pos - neg) / max(pos + neg, 1)
         discount = 1.0 - (0.15 * unc)
-        sentiment = round(raw * max(discount, 0.3), 3)
-        
-        news_signals[company_name] = sentiment
+        news_signals[company_name] = round(raw * max(discount, 0.3), 3)
     
     return news_signals
 
 
 def translate_constraints(filepath):
-    with open(filepath, "r") as f:
-        text = f.read().lower()
+    text = Path(filepath).read_text().lower()
     
     constraints = {}
     
@@ -131,48 +177,46 @@ def normalize(value, min_val, max_val, invert=False):
 
 
 def scorer_financial(companies):
-    scores = {}
-    growths = [c["revenue_growth"] for c in companies]
-    margins = [c["ebitda_margin"] for c in companies]
+    growths = companies["revenue_growth"]
+    margins = companies["ebitda_margin"]
+    g_min, g_max = min(growths), max(growths)
+    m_min, m_max = min(margins), max(margins)
     
-    for c in companies:
-        g = normalize(c["revenue_growth"], min(growths), max(growths))
-        m = normalize(c["ebitda_margin"], min(margins), max(margins))
-        scores[c["name"]] = round(0.4 * g + 0.6 * m, 4)
-    return scores
+    return [
+        0.4 * normalize(growth, g_min, g_max) + 0.6 * normalize(margin, m_min, m_max)
+        for growth, margin in zip(growths, margins)
+    ]
 
 
 def scorer_risk(companies, constraints):
-    scores = {}
-    vols = [c["volatility"] for c in companies]
-    dtes = [c["debt_to_equity"] for c in companies]
-    risk_map = {"Low": 1.0, "Medium": 0.6, "High": 0.2}
+    vols = companies["volatility"]
+    dtes = companies["debt_to_equity"]
+    max_vol = constraints["max_volatility"]
+    max_dte = constraints["max_debt_to_equity"]
+    v_min, v_max = min(vols), max(vols)
+    d_min, d_max = min(dtes), max(dtes)
     
-    for c in companies:
-        vol = normalize(c["volatility"], min(vols), max(vols), invert=True)
-        dte = normalize(c["debt_to_equity"], min(dtes), max(dtes), invert=True)
-        op = risk_map.get(c["operational_risk"], 0.5)
-        
-        penalty = 0.0
-        if c["volatility"] > constraints["max_volatility"]:
-            penalty += 0.3
-        if c["debt_to_equity"] > constraints["max_debt_to_equity"]:
-            penalty += 0.3
-        
-        raw = 0.35 * vol + 0.35 * dte + 0.30 * op
-        scores[c["name"]] = round(max(raw - penalty, 0.0), 4)
+    scores = []
+    for v, d, op_code in zip(vols, dtes, companies["operational_risk_code"]):
+        vol = normalize(v, v_min, v_max, invert=True)
+        dte = normalize(d, d_min, d_max, invert=True)
+        op = OPERATIONAL_RISK_SCORES[op_code]
+        penalty = 0.3 * (v > max_vol) + 0.3 * (d > max_dte)
+        scores.append(max(0.35 * vol + 0.35 * dte + 0.30 * op - penalty, 0.0))
     return scores
 
 
 def scorer_news(companies, news_signals):
-    scores = {}
-    for c in companies:
-        sentiment = news_signals.get(c["name"], 0.0)
-        score = (sentiment + 1) / 2
-        if c["is_corrupted"]:
-            score *= 0.85
-        scores[c["name"]] = round(score, 4)
-    return scores
+    sentiments = [news_signals.get(name, 0.0) for name in companies["name"]]
+    factors = [0.85 if bad else 1.0 for bad in companies["is_corrupted"]]
+    return [(sentiment + 1) * 0.5 * factor for sentiment, factor in zip(sentiments, factors)]
+
+
+def fuse_scores(fin, risk, news):
+    return [
+        round(FINANCIAL_WEIGHT * f + RISK_WEIGHT * r + NEWS_WEIGHT * n, 4)
+        for f, r, n in zip(fin, risk, news)
+    ]
 
 
 
@@ -189,30 +233,39 @@ def run_agent(data_dir):
     risk = scorer_risk(companies, constraints)
     news = scorer_news(companies, news_signals)
     
-    final = {}
-    for name in fin:
-        final[name] = round(0.30 * fin[name] + 0.45 * risk[name] + 0.25 * news[name], 4)
+    # A repeated company name is ranked once, in first-seen order, using its last row
+    last_row = {name: i for i, name in enumerate(companies["name"])}
+    names = list(last_row)
+    rows = list(last_row.values())
+    final = fuse_scores(
+        [fin[i] for i in rows],
+        [risk[i] for i in rows],
+        [news[i] for i in rows],
+    )
     
-    ranking = sorted(final.items(), key=lambda x: x[1], reverse=True)
-    ranked_names = [name for name, _ in ranking]
+    order = sorted(range(len(names)), key=final.__getitem__, reverse=True)
+    ranked_names = [names[i] for i in order]
     recommended = ranked_names[0]
     
-    top_gap = ranking[0][1] - ranking[1][1] if len(ranking) >= 2 else 0
+    top_gap = final[order[0]] - final[order[1]] if len(order) >= 2 else 0
+    has_corrupted = any(companies["is_corrupted"])
+    has_imputed = any(companies["esg_imputed"])
+    
     confidence = 0.80
     if top_gap < 0.05:
         confidence -= 0.15
-    if any(c["is_corrupted"] for c in companies):
+    if has_corrupted:
         confidence -= 0.07
-    if any(c.get("esg_imputed") for c in companies):
+    if has_imputed:
         confidence -= 0.05
     confidence = round(max(0.3, confidence), 2)
     
     uncertainty_factors = []
     if top_gap < 0.05:
         uncertainty_factors.append(f"Top 2 scores very close (gap={top_gap:.3f})")
-    if any(c["is_corrupted"] for c in companies):
+    if has_corrupted:
         uncertainty_factors.append("Corrupted data present")
-    if any(c.get("esg_imputed") for c in companies):
+    if has_imputed:
         uncertainty_factors.append("ESG values were imputed")
     
     submission = {
@@ -236,9 +289,9 @@ def run_agent(data_dir):
             "stability": str(constraints["stability_preference"]),
         },
         "scoring_methodology": {
-            "financial_weight": 0.30,
-            "risk_weight": 0.45,
-            "news_weight": 0.25,
+            "financial_weight": FINANCIAL_WEIGHT,
+            "risk_weight": RISK_WEIGHT,
+            "news_weight": NEWS_WEIGHT,
             "description": (
                 "Financial: 40% growth + 60% margin. "
                 "Risk: normalized volatility + leverage + operational risk, "
@@ -257,14 +310,20 @@ def run_agent(data_dir):
     return submission
 
 
+def write_submission(submission, output_path):
+    if orjson is not None:
+        Path(output_path).write_bytes(orjson.dumps(submission, option=orjson.OPT_INDENT_2))
+    else:
+        Path(output_path).write_text(json.dumps(submission, indent=2))
+
+
 if __name__ == "__main__":
     data_dir = sys.argv[1] if len(sys.argv) > 1 else "."
     
     submission = run_agent(data_dir)
     
     output_path = Path(data_dir) / "submission.json"
-    with open(output_path, "w") as f:
-        json.dump(submission, f, indent=2)
+    write_submission(submission, output_path)
     
     print(f"RECOMMENDATION: {submission['recommended_company']}")
     print(f"CONFIDENCE: {submission['confidence_score']}")